@@ -0,0 +1,38 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+预编译(AOT)MACD和RSI计算内核
+运行后在本目录生成 _kernels_aot 扩展模块，stock_indicator_monitor
+启动时优先导入该模块，省去JIT编译及缓存加载的时间
+"""
+import os
+import sys
+
+from utils._njit import NUMBA_AVAILABLE
+
+
+def build():
+    """
+    编译并导出MACD和RSI内核
+    """
+    if not NUMBA_AVAILABLE:
+        print("未安装numba，无法预编译计算内核")
+        return 1
+
+    from numba.pycc import CC
+    from utils._kernels import macd_kernel, rsi_kernel
+
+    cc = CC("_kernels_aot")
+    cc.output_dir = os.path.dirname(os.path.abspath(__file__))
+
+    # CC.export 不支持fastmath等编译选项，JIT内核同样不启用fastmath，两者浮点计算结果一致
+    cc.export("macd_kernel", "UniTuple(f4[:], 3)(f4[:], f8, f8, f8)")(macd_kernel.py_func)
+    cc.export("rsi_kernel", "f4[:](f4[:], f4[:], i8)")(rsi_kernel.py_func)
+
+    cc.compile()
+    print(f"已生成预编译内核: {cc.output_dir}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(build())
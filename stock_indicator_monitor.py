@@ -1,7 +1,38 @@
-import yfinance as yf
+import argparse
+import glob
+import io
+import math
+import os
+import sys
+import time
+from functools import lru_cache
 import pandas as pd
 import numpy as np
-from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+
+# 优先使用 build_kernels.py 预编译(AOT)的内核，省去导入numba、JIT编译及缓存加载
+# 预编译内核不检查参数类型，调用方须传入float32数组
+try:
+    from _kernels_aot import macd_kernel as _macd_entry, rsi_kernel as _rsi_entry
+except ImportError:
+    from utils._kernels import macd_kernel as _macd_entry, rsi_kernel as _rsi_entry
+
+
+# 默认获取的数据时间范围，需覆盖MACD慢速EMA和RSI的预热期
+DEFAULT_PERIOD = "6mo"
+
+# 行情数据本地缓存目录，缓存文件按 (代码, 时间范围, 日期) 区分
+CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "stock_monitor")
+
+# 未设置 YF_CACHE_TTL 时，包含当天(可能尚未收盘)K线的缓存的有效时长(秒)
+_INTRADAY_CACHE_TTL = 15 * 60
+
+# RSI状态标签，按 超卖(<30) / 正常 / 超买(>70) 排列
+_RSI_STATUS_LABELS = np.array(["超卖", "正常", "超买"])
+
+# 已创建的yf.Ticker对象，同一代码在多次查询间复用
+_TICKERS = {}
 
 
 def calculate_macd(data, fast=12, slow=26, signal=9):
@@ -13,51 +44,194 @@ def calculate_macd(data, fast=12, slow=26, signal=9):
     :param signal: 信号线EMA周期
     :return: MACD线, 信号线, MACD柱状图
     """
-    close_prices = data['Close']
-    
-    # 计算快速和慢速EMA
-    ema_fast = close_prices.ewm(span=fast).mean()
-    ema_slow = close_prices.ewm(span=slow).mean()
-    
-    # 计算MACD线
-    macd_line = ema_fast - ema_slow
-    
-    # 计算信号线
-    signal_line = macd_line.ewm(span=signal).mean()
+    close_prices = data['Close'].to_numpy(dtype=np.float32)
     
-    # 计算柱状图
-    histogram = macd_line - signal_line
+    # 一次遍历完成EMA、MACD线、信号线和柱状图的计算
+    macd_line, signal_line, histogram = _macd_entry(
+        close_prices, 2.0 / (fast + 1), 2.0 / (slow + 1), 2.0 / (signal + 1)
+    )
     
     return macd_line, signal_line, histogram
 
 
 def calculate_rsi(data, period=14):
     """
-    计算RSI指标
+    计算RSI指标 (Wilder平滑法，与TA-Lib一致)
     :param data: 股票数据
     :param period: RSI计算周期
     :return: RSI值
     """
-    close_prices = data['Close']
+    close_prices = data['Close'].to_numpy(dtype=np.float32)
+    gain, loss = _split_price_changes(close_prices)
+    
+    return _rsi_entry(gain, loss, period)
+
+
+def _split_price_changes(close_prices):
+    """
+    计算价格变化(首日记为0，与收盘价对齐)，并分离上涨和下跌的幅度
+    :param close_prices: 收盘价数组，二维时按行(最后一维)计算
+    :return: 上涨幅度数组, 下跌幅度数组
+    """
+    price_diff = np.diff(close_prices, axis=-1, prepend=close_prices[..., :1])
+    gain = np.maximum(price_diff, 0.0)
+    loss = np.maximum(-price_diff, 0.0)
+    
+    return gain, loss
+
+
+def _ema_totals(n, span):
+    """
+    EMA (adjust=True) 各位置的权重和，第t个值为 sum((1-alpha)^j, j=0..t)
+    :param n: 序列长度
+    :param span: EMA周期
+    :return: 长度为n的权重和数组
+    """
+    decay = 1.0 - 2.0 / (span + 1)
+    
+    return (1.0 - decay ** np.arange(1, n + 1, dtype=np.float64)) / (1.0 - decay)
+
+
+def _reverse_decay_sum(values, decay):
+    """
+    反向递推累加，result[k] = sum(values[t] * decay^(t-k), t>=k)
+    :param values: 输入数组
+    :param decay: 衰减系数
+    :return: 与values等长的数组
+    """
+    result = np.empty(len(values))
+    acc = 0.0
+    for k, value in zip(range(len(values) - 1, -1, -1), values[::-1].tolist()):
+        acc = value + decay * acc
+        result[k] = acc
     
-    # 计算价格变化
-    price_diff = close_prices.diff()
+    return result
+
+
+@lru_cache(maxsize=32)
+def _ema_weights(n, span):
+    """
+    EMA最新值的权重向量 w，使 EMA[-1] = w @ x
+    权重为 (1-alpha)^(n-1-k)，再除以权重和以与pandas ewm(adjust=True)一致
+    :param n: 序列长度
+    :param span: EMA周期
+    :return: 长度为n的只读权重数组
+    """
+    decay = 1.0 - 2.0 / (span + 1)
+    weights = decay ** np.arange(n - 1, -1, -1, dtype=np.float64)
+    weights /= weights.sum()
+    weights.setflags(write=False)
     
-    # 分离上涨和下跌的价格变化
-    gain = price_diff.where(price_diff > 0, 0)
-    loss = -price_diff.where(price_diff < 0, 0)
+    return weights
+
+
+@lru_cache(maxsize=32)
+def _macd_weights(n, fast, slow, signal):
+    """
+    MACD线和信号线最新值对收盘价的权重向量
+    EMA为线性运算，信号线(MACD的EMA)的最新值同样可写成收盘价的加权和
+    :param n: 序列长度
+    :param fast: 快速EMA周期
+    :param slow: 慢速EMA周期
+    :param signal: 信号线EMA周期
+    :return: MACD权重数组, 信号线权重数组
+    """
+    macd_weights = _ema_weights(n, fast) - _ema_weights(n, slow)
+    
+    # 信号线最新值 = sum(s[t] * MACD[t])，而MACD[t]对x[k]的权重为 decay^(t-k) / 权重和[t]，
+    # 对每个k按t反向递推累加即可在O(n)内得到信号线权重
+    signal_ema_weights = _ema_weights(n, signal)
+    signal_weights = (
+        _reverse_decay_sum(signal_ema_weights / _ema_totals(n, fast), 1.0 - 2.0 / (fast + 1))
+        - _reverse_decay_sum(signal_ema_weights / _ema_totals(n, slow), 1.0 - 2.0 / (slow + 1))
+    )
+    macd_weights.setflags(write=False)
+    signal_weights.setflags(write=False)
+    
+    return macd_weights, signal_weights
+
+
+@lru_cache(maxsize=32)
+def _wilder_weights(n, period):
+    """
+    Wilder平滑最新值的权重向量 w，使 平均涨(跌)幅[-1] = w @ gain(loss)
+    :param n: 序列长度 (需大于period)
+    :param period: RSI计算周期
+    :return: 长度为n的只读权重数组
+    """
+    decay = (period - 1) / period
+    weights = np.empty(n)
+    weights[0] = 0.0
+    # 初始值为前period个变化的简单平均，之后每步衰减 (period - 1) / period
+    weights[1:period + 1] = decay ** (n - 1 - period) / period
+    weights[period + 1:] = decay ** np.arange(n - period - 2, -1, -1) / period
+    weights.setflags(write=False)
+    
+    return weights
+
+
+def calculate_latest_indicators(data, fast=12, slow=26, signal=9, period=14):
+    """
+    只计算MACD线、信号线和RSI的最新值
+    使用按序列长度缓存的权重向量，每个指标只需一次点积
+    :param data: 股票数据
+    :param fast: 快速EMA周期
+    :param slow: 慢速EMA周期
+    :param signal: 信号线EMA周期
+    :param period: RSI计算周期
+    :return: 最新MACD值, 最新信号线值, 最新RSI值
+    """
+    close_prices = data['Close'].to_numpy(dtype=np.float64)
+    n = close_prices.size
     
-    # 计算平均收益和平均损失
-    avg_gain = gain.rolling(window=period).mean()
-    avg_loss = loss.rolling(window=period).mean()
+    macd_weights, signal_weights = _macd_weights(n, fast, slow, signal)
+    latest_macd = float(macd_weights @ close_prices)
+    latest_signal = float(signal_weights @ close_prices)
     
-    # 计算RS (相对强度)
-    rs = avg_gain / avg_loss
+    if n <= period:
+        return latest_macd, latest_signal, np.nan
     
-    # 计算RSI
-    rsi = 100 - (100 / (1 + rs))
+    gain, loss = _split_price_changes(close_prices)
+    rsi_weights = _wilder_weights(n, period)
+    avg_gain = rsi_weights @ gain
+    avg_loss = rsi_weights @ loss
+    latest_rsi = 100.0 - 100.0 / (1.0 + avg_gain / avg_loss) if avg_loss > 0 else 100.0
     
-    return rsi
+    return latest_macd, latest_signal, float(latest_rsi)
+
+
+def calculate_indicators_batch(datas, fast=12, slow=26, signal=9, period=14):
+    """
+    批量计算多只股票的MACD和RSI
+    :param datas: 股票数据列表
+    :param fast: 快速EMA周期
+    :param slow: 慢速EMA周期
+    :param signal: 信号线EMA周期
+    :param period: RSI计算周期
+    :return: 每只股票的 (MACD线, 信号线, MACD柱状图, RSI) 列表
+    """
+    lengths = np.array([len(data) for data in datas], dtype=np.intp)
+    n_bars = int(lengths.max()) if len(datas) else 0
+    
+    # 将收盘价右对齐堆叠成矩阵，使各行最新K线位于同一列
+    prices = np.full((len(datas), n_bars), np.nan, dtype=np.float32)
+    for row, data in zip(prices, datas):
+        row[n_bars - len(data):] = data['Close'].to_numpy(dtype=np.float32)
+    gains, losses = _split_price_changes(prices)
+    
+    # 批量计算内核无法预编译，使用时才导入numba
+    from utils._kernels import batch_kernel
+    
+    macd_lines, signal_lines, histograms, rsis = batch_kernel(
+        prices, gains, losses, lengths,
+        2.0 / (fast + 1), 2.0 / (slow + 1), 2.0 / (signal + 1), period
+    )
+    
+    return [
+        (macd_lines[s, n_bars - length:], signal_lines[s, n_bars - length:],
+         histograms[s, n_bars - length:], rsis[s, n_bars - length:])
+        for s, length in enumerate(lengths)
+    ]
 
 
 def detect_macd_signals(macd_line, signal_line):
@@ -67,17 +241,14 @@ def detect_macd_signals(macd_line, signal_line):
     :param signal_line: 信号线
     :return: 买入信号、卖出信号列表
     """
-    # MACD线上穿信号线为买入信号
-    buy_signals = []
-    sell_signals = []
+    diff = np.asarray(macd_line) - np.asarray(signal_line)
+    prev, cur = diff[:-1], diff[1:]
     
-    for i in range(1, len(macd_line)):
-        if macd_line.iloc[i-1] <= signal_line.iloc[i-1] and macd_line.iloc[i] > signal_line.iloc[i]:
-            buy_signals.append(i)
-        elif macd_line.iloc[i-1] >= signal_line.iloc[i-1] and macd_line.iloc[i] < signal_line.iloc[i]:
-            sell_signals.append(i)
+    # MACD线上穿信号线为买入信号，下穿为卖出信号
+    buy_signals = np.flatnonzero((prev <= 0) & (cur > 0)) + 1
+    sell_signals = np.flatnonzero((prev >= 0) & (cur < 0)) + 1
     
-    return buy_signals, sell_signals
+    return buy_signals.tolist(), sell_signals.tolist()
 
 
 def detect_rsi_signals(rsi_data):
@@ -86,19 +257,45 @@ def detect_rsi_signals(rsi_data):
     :param rsi_data: RSI数据
     :return: 买入信号、卖出信号列表
     """
-    buy_signals = []  # 当RSI从下向上突破30时为买入信号
-    sell_signals = []  # 当RSI从上向下跌破70时为卖出信号
+    rsi = np.asarray(rsi_data)
+    prev, cur = rsi[:-1], rsi[1:]
+    
+    # NaN参与比较结果均为False，无需单独过滤
+    # RSI从下向上突破30为超卖反弹，可能是买入信号
+    buy_signals = np.flatnonzero((prev <= 30) & (cur > 30)) + 1
+    # RSI从上向下跌破70为超买回调，可能是卖出信号
+    sell_signals = np.flatnonzero((prev >= 70) & (cur < 70)) + 1
+    
+    return buy_signals.tolist(), sell_signals.tolist()
+
+
+def detect_combined_signals(macd_signals, rsi_signals, window=2):
+    """
+    检测MACD信号附近是否同时出现RSI信号
+    :param macd_signals: MACD信号位置列表(升序)
+    :param rsi_signals: RSI信号位置列表(升序)
+    :param window: 允许的最大间隔K线数
+    :return: 同时出现信号的MACD信号位置列表
+    """
+    macd_idx = np.asarray(macd_signals, dtype=np.intp)
+    rsi_idx = np.asarray(rsi_signals, dtype=np.intp)
     
-    for i in range(1, len(rsi_data)):
-        # RSI从下向上突破30为超卖反弹，可能是买入信号
-        if pd.notna(rsi_data.iloc[i-1]) and pd.notna(rsi_data.iloc[i]):
-            if rsi_data.iloc[i-1] <= 30 and rsi_data.iloc[i] > 30:
-                buy_signals.append(i)
-            # RSI从上向下跌破70为超买回调，可能是卖出信号
-            elif rsi_data.iloc[i-1] >= 70 and rsi_data.iloc[i] < 70:
-                sell_signals.append(i)
+    # 二分查找每个MACD信号前后window根K线内的RSI信号区间
+    lo = np.searchsorted(rsi_idx, macd_idx - window, side='left')
+    hi = np.searchsorted(rsi_idx, macd_idx + window, side='right')
     
-    return buy_signals, sell_signals
+    return macd_idx[hi > lo].tolist()
+
+
+def _classify_rsi(rsi_values):
+    """
+    批量判断RSI所处的超买/超卖状态
+    :param rsi_values: RSI值数组
+    :return: 状态描述数组
+    """
+    rsi_values = np.asarray(rsi_values)
+    # RSI < 30 取下标0，RSI > 70 取下标2，其余(含NaN)取下标1
+    return _RSI_STATUS_LABELS[np.where(rsi_values < 30, 0, np.where(rsi_values > 70, 2, 1))]
 
 
 def detect_overbought_oversold(rsi_value):
@@ -107,58 +304,199 @@ def detect_overbought_oversold(rsi_value):
     :param rsi_value: 当前RSI值
     :return: 状态描述
     """
-    if rsi_value > 70:
-        return "超买"
-    elif rsi_value < 30:
-        return "超卖"
-    else:
-        return "正常"
+    return str(_classify_rsi(np.array([rsi_value]))[0])
+
+
+def _cache_path(symbol, period):
+    """
+    获取股票数据缓存文件路径
+    :param symbol: 股票代码
+    :param period: 数据时间范围
+    :return: 缓存文件路径
+    """
+    return os.path.join(CACHE_DIR, f"{symbol.upper()}_{period}_{date.today()}.parquet")
+
+
+def _read_cache(path):
+    """
+    读取缓存的股票数据
+    设置环境变量 YF_CACHE_TTL (秒) 时，超过该时长的缓存视为过期；
+    未设置时，最后一根K线为当天(交易时段内数据仍在变化)的缓存在 _INTRADAY_CACHE_TTL 后过期
+    :param path: 缓存文件路径
+    :return: 股票数据DataFrame，缓存不存在或已过期时返回None
+    """
+    try:
+        if os.path.getsize(path) == 0:
+            return None
+        
+        age = time.time() - os.path.getmtime(path)
+        ttl = os.environ.get("YF_CACHE_TTL")
+        if ttl and age > float(ttl):
+            return None
+        
+        data = pd.read_parquet(path)
+        if not ttl and age > _INTRADAY_CACHE_TTL and not data.empty:
+            # 按交易所时区判断最后一根K线是否为当天
+            last_bar = data.index[-1]
+            if last_bar.date() == pd.Timestamp.now(tz=last_bar.tz).date():
+                return None
+        
+        return data
+    except (OSError, ImportError, ValueError):
+        return None
+
+
+def _write_cache(path, data):
+    """
+    写入股票数据缓存，并删除同一代码和时间范围的往日缓存，写入失败(如未安装pyarrow)时忽略
+    :param path: 缓存文件路径
+    :param data: 股票数据DataFrame
+    """
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        data.to_parquet(tmp_path)
+        # 先写临时文件再替换，避免读到写了一半的缓存
+        os.replace(tmp_path, path)
+    except (OSError, ImportError, ValueError):
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        return
+    
+    # 缓存文件名以日期结尾，去掉日期即为 "代码_时间范围" 前缀
+    prefix = os.path.basename(path).rsplit("_", 1)[0]
+    for old_path in glob.glob(os.path.join(glob.escape(CACHE_DIR), f"{glob.escape(prefix)}_*.parquet")):
+        if old_path != path:
+            try:
+                os.remove(old_path)
+            except OSError:
+                pass
+
+
+def _get_ticker(symbol):
+    """
+    获取股票代码对应的yf.Ticker对象，已创建过的直接复用
+    yfinance内部共享同一会话及cookie/crumb，无需另外传入session
+    :param symbol: 股票代码
+    :return: yf.Ticker对象
+    """
+    symbol = symbol.upper()
+    ticker = _TICKERS.get(symbol)
+    if ticker is None:
+        # yfinance导入较慢，延迟到首次请求数据时再导入
+        import yfinance as yf
+        
+        ticker = _TICKERS.setdefault(symbol, yf.Ticker(symbol))
+    return ticker
 
 
-def get_stock_data(symbol, period="6mo"):
+def get_stock_data(symbol, period=DEFAULT_PERIOD, out=None):
     """
-    获取股票数据
+    获取股票数据，当天已获取过的数据直接从本地缓存读取
     :param symbol: 股票代码
     :param period: 数据时间范围
+    :param out: 错误信息的输出目标文件对象，默认为sys.stdout
     :return: 股票数据DataFrame
     """
+    path = _cache_path(symbol, period)
+    data = _read_cache(path)
+    if data is not None:
+        return data
+    
     try:
-        stock = yf.Ticker(symbol)
+        stock = _get_ticker(symbol)
         data = stock.history(period=period)
         
         if data.empty:
-            print(f"无法获取 {symbol} 的数据")
+            print(f"无法获取 {symbol} 的数据", file=out)
             return None
         
+        _write_cache(path, data)
         return data
     except Exception as e:
-        print(f"获取 {symbol} 数据时出错: {e}")
+        print(f"获取 {symbol} 数据时出错: {e}", file=out)
         return None
 
 
-def analyze_stock_indicators(symbol):
+def _write_report(buf, out):
     """
-    分析股票的技术指标
+    将缓冲区中的分析结果一次性写出
+    :param buf: 分析结果缓冲区
+    :param out: 输出目标文件对象
+    """
+    out.write(buf.getvalue())
+
+
+def _report_heading(symbol, out):
+    """
+    输出单只股票分析结果的标题
     :param symbol: 股票代码
+    :param out: 输出目标文件对象
     """
-    print(f"\n正在分析 {symbol.upper()} 的技术指标...")
-    
-    # 获取股票数据
-    data = get_stock_data(symbol)
-    if data is None:
-        return
-    
-    # 计算MACD
-    macd_line, signal_line, histogram = calculate_macd(data)
+    print(f"\n正在分析 {symbol.upper()} 的技术指标...", file=out)
+
+
+def _fetch_stock_data(symbol, period):
+    """
+    获取股票数据，并记录获取过程中的错误信息，供多线程并发调用
+    :param symbol: 股票代码
+    :param period: 数据时间范围
+    :return: 股票数据DataFrame(失败时为None), 错误信息
+    """
+    log = io.StringIO()
+    data = get_stock_data(symbol, period, out=log)
     
-    # 计算RSI
-    rsi = calculate_rsi(data)
+    return data, log.getvalue()
+
+
+def _report_indicators(data, out, latest_only=False, indicators=None, rsi_status=None):
+    """
+    计算技术指标并输出分析结果
+    :param data: 股票数据
+    :param out: 输出目标文件对象
+    :param latest_only: 是否只显示最新指标值(不检测买卖信号)
+    :param indicators: 已计算的 (MACD线, 信号线, MACD柱状图, RSI)，为None时自动计算
+    :param rsi_status: 已判断的最新RSI状态，为None时自动判断
+    """
+    if latest_only:
+        # 只需最新值时无需计算完整序列
+        macd_value, signal_value, rsi_value = calculate_latest_indicators(data)
+    else:
+        if indicators is not None:
+            macd_line, signal_line, histogram, rsi = indicators
+        else:
+            # 计算MACD
+            macd_line, signal_line, histogram = calculate_macd(data)
+            
+            # 计算RSI
+            rsi = calculate_rsi(data)
+        
+        # 指标序列为float32，显示前转换为Python float
+        macd_value = float(macd_line[-1])
+        signal_value = float(signal_line[-1])
+        rsi_value = float(rsi[-1])
     
-    # 添加到数据中
-    data['MACD'] = macd_line
-    data['Signal_Line'] = signal_line
-    data['Histogram'] = histogram
-    data['RSI'] = rsi
+    # 显示最新数据
+    latest_date = data.index[-1].strftime('%Y-%m-%d')
+    latest_price = data['Close'].iloc[-1]
+    latest_macd = "N/A" if math.isnan(macd_value) else f"{macd_value:.4f}"
+    latest_signal = "N/A" if math.isnan(signal_value) else f"{signal_value:.4f}"
+    if math.isnan(rsi_value):
+        latest_rsi = "N/A (N/A)"
+    else:
+        if rsi_status is None:
+            # 按显示的两位小数判断状态，与显示值保持一致
+            rsi_status = detect_overbought_oversold(round(rsi_value, 2))
+        latest_rsi = f"{rsi_value:.2f} ({rsi_status})"
+    
+    print(f"日期: {latest_date}", file=out)
+    print(f"收盘价: ${latest_price:.2f}", file=out)
+    print(f"MACD: {latest_macd}", file=out)
+    print(f"信号线: {latest_signal}", file=out)
+    print(f"RSI: {latest_rsi}", file=out)
+    
+    if latest_only:
+        return
     
     # 检测MACD信号
     macd_buy_signals, macd_sell_signals = detect_macd_signals(macd_line, signal_line)
@@ -166,100 +504,148 @@ def analyze_stock_indicators(symbol):
     # 检测RSI信号
     rsi_buy_signals, rsi_sell_signals = detect_rsi_signals(rsi)
     
-    # 显示最新数据
-    latest_date = data.index[-1].strftime('%Y-%m-%d')
-    latest_price = round(data['Close'].iloc[-1], 2)
-    latest_macd = round(data['MACD'].iloc[-1], 4) if pd.notna(data['MACD'].iloc[-1]) else "N/A"
-    latest_signal = round(data['Signal_Line'].iloc[-1], 4) if pd.notna(data['Signal_Line'].iloc[-1]) else "N/A"
-    latest_rsi = round(data['RSI'].iloc[-1], 2) if pd.notna(data['RSI'].iloc[-1]) else "N/A"
-    rsi_status = detect_overbought_oversold(latest_rsi) if isinstance(latest_rsi, float) else "N/A"
-    
-    print(f"日期: {latest_date}")
-    print(f"收盘价: ${latest_price}")
-    print(f"MACD: {latest_macd}")
-    print(f"信号线: {latest_signal}")
-    print(f"RSI: {latest_rsi} ({rsi_status})")
+    # 一次性格式化所有日期，后续按信号位置直接取用
+    date_strs = data.index.strftime('%Y-%m-%d').to_numpy()
     
     # 显示MACD信号
-    print("\n--- MACD 信号 ---")
+    print("\n--- MACD 信号 ---", file=out)
     if macd_buy_signals:
-        recent_macd_buy_dates = [data.index[idx].strftime('%Y-%m-%d') for idx in macd_buy_signals[-3:]]
-        print(f"最近MACD买入信号日期: {recent_macd_buy_dates}")
+        recent_macd_buy_dates = date_strs[macd_buy_signals[-3:]].tolist()
+        print(f"最近MACD买入信号日期: {recent_macd_buy_dates}", file=out)
     else:
-        print("最近没有MACD买入信号")
+        print("最近没有MACD买入信号", file=out)
     
     if macd_sell_signals:
-        recent_macd_sell_dates = [data.index[idx].strftime('%Y-%m-%d') for idx in macd_sell_signals[-3:]]
-        print(f"最近MACD卖出信号日期: {recent_macd_sell_dates}")
+        recent_macd_sell_dates = date_strs[macd_sell_signals[-3:]].tolist()
+        print(f"最近MACD卖出信号日期: {recent_macd_sell_dates}", file=out)
     else:
-        print("最近没有MACD卖出信号")
+        print("最近没有MACD卖出信号", file=out)
     
     # 显示RSI信号
-    print("\n--- RSI 信号 ---")
+    print("\n--- RSI 信号 ---", file=out)
     if rsi_buy_signals:
-        recent_rsi_buy_dates = [data.index[idx].strftime('%Y-%m-%d') for idx in rsi_buy_signals[-3:]]
-        print(f"最近RSI买入信号日期: {recent_rsi_buy_dates}")
+        recent_rsi_buy_dates = date_strs[rsi_buy_signals[-3:]].tolist()
+        print(f"最近RSI买入信号日期: {recent_rsi_buy_dates}", file=out)
     else:
-        print("最近没有RSI买入信号")
+        print("最近没有RSI买入信号", file=out)
     
     if rsi_sell_signals:
-        recent_rsi_sell_dates = [data.index[idx].strftime('%Y-%m-%d') for idx in rsi_sell_signals[-3:]]
-        print(f"最近RSI卖出信号日期: {recent_rsi_sell_dates}")
+        recent_rsi_sell_dates = date_strs[rsi_sell_signals[-3:]].tolist()
+        print(f"最近RSI卖出信号日期: {recent_rsi_sell_dates}", file=out)
     else:
-        print("最近没有RSI卖出信号")
+        print("最近没有RSI卖出信号", file=out)
     
     # 综合信号分析
-    print("\n--- 综合信号分析 ---")
-    combined_buy_signals = []
-    combined_sell_signals = []
-    
-    # 检查是否有同时出现的MACD和RSI信号
-    for date_idx in macd_buy_signals:
-        date = data.index[date_idx]
-        # 检查该日期附近是否有RSI买入信号
-        rsi_buy_dates = [data.index[idx] for idx in rsi_buy_signals]
-        for rsi_date in rsi_buy_dates:
-            if abs((date - rsi_date).days) <= 2:  # 在2天内同时出现信号
-                combined_buy_signals.append(date.strftime('%Y-%m-%d'))
-                
-    for date_idx in macd_sell_signals:
-        date = data.index[date_idx]
-        # 检查该日期附近是否有RSI卖出信号
-        rsi_sell_dates = [data.index[idx] for idx in rsi_sell_signals]
-        for rsi_date in rsi_sell_dates:
-            if abs((date - rsi_date).days) <= 2:  # 在2天内同时出现信号
-                combined_sell_signals.append(date.strftime('%Y-%m-%d'))
+    print("\n--- 综合信号分析 ---", file=out)
+    # 检查是否有同时出现的MACD和RSI信号 (在2根K线内同时出现信号)
+    combined_buy_signals = date_strs[detect_combined_signals(macd_buy_signals, rsi_buy_signals)].tolist()
+    combined_sell_signals = date_strs[detect_combined_signals(macd_sell_signals, rsi_sell_signals)].tolist()
     
     if combined_buy_signals:
-        print(f"最近同时出现MACD和RSI买入信号的日期: {combined_buy_signals[-3:]}")
+        print(f"最近同时出现MACD和RSI买入信号的日期: {combined_buy_signals[-3:]}", file=out)
     else:
-        print("最近没有同时出现MACD和RSI买入信号")
+        print("最近没有同时出现MACD和RSI买入信号", file=out)
     
     if combined_sell_signals:
-        print(f"最近同时出现MACD和RSI卖出信号的日期: {combined_sell_signals[-3:]}")
+        print(f"最近同时出现MACD和RSI卖出信号的日期: {combined_sell_signals[-3:]}", file=out)
+    else:
+        print("最近没有同时出现MACD和RSI卖出信号", file=out)
+
+
+def analyze_stock_indicators(symbol, data=None, latest_only=False, period=DEFAULT_PERIOD, out=None):
+    """
+    分析股票的技术指标
+    :param symbol: 股票代码
+    :param data: 已获取的股票数据，为None时自动获取
+    :param latest_only: 是否只显示最新指标值(不检测买卖信号)
+    :param period: 自动获取数据时的时间范围
+    :param out: 输出目标文件对象，默认为sys.stdout
+    """
+    out = sys.stdout if out is None else out
+    
+    # 分析结果先写入缓冲区，最后一次性输出
+    buf = io.StringIO()
+    _report_heading(symbol, buf)
+    
+    # 获取股票数据
+    if data is None:
+        # 获取数据时的错误信息同样写入缓冲区，位于标题之后
+        data = get_stock_data(symbol, period, out=buf)
+    if data is not None:
+        _report_indicators(data, buf, latest_only=latest_only)
+    
+    _write_report(buf, out)
+
+
+def analyze_many(symbols, latest_only=False, period=DEFAULT_PERIOD, out=None):
+    """
+    并发获取多只股票的数据，批量计算技术指标后依次输出分析结果
+    :param symbols: 股票代码列表
+    :param latest_only: 是否只显示最新指标值(不检测买卖信号)
+    :param period: 数据时间范围
+    :param out: 输出目标文件对象，默认为sys.stdout
+    """
+    if not symbols:
+        return
+    out = sys.stdout if out is None else out
+    
+    # 数据获取受网络延迟限制，使用线程池并发请求，错误信息留待按顺序输出
+    with ThreadPoolExecutor(max_workers=min(8, len(symbols))) as executor:
+        results = list(executor.map(_fetch_stock_data, symbols, [period] * len(symbols)))
+    
+    fetched = [data for data, _ in results if data is not None]
+    if latest_only or len(fetched) <= 1:
+        # 只有一只股票时直接调用 calculate_macd/calculate_rsi，可使用预编译(AOT)内核
+        indicators = [None] * len(fetched)
+        rsi_statuses = [None] * len(fetched)
     else:
-        print("最近没有同时出现MACD和RSI卖出信号")
+        # 所有数据下载完成后，在多核上并行计算各股票的指标
+        indicators = calculate_indicators_batch(fetched)
+        # 一次性判断所有股票最新RSI的状态
+        rsi_statuses = _classify_rsi(np.round([float(rsi[-1]) for _, _, _, rsi in indicators], 2)).tolist()
+    
+    batch_results = iter(zip(indicators, rsi_statuses))
+    for symbol, (data, log) in zip(symbols, results):
+        # 每只股票的分析结果先写入缓冲区，再一次性输出
+        buf = io.StringIO()
+        _report_heading(symbol, buf)
+        if data is None:
+            # 获取失败的股票同样先输出标题，再输出错误信息
+            buf.write(log)
+        else:
+            symbol_indicators, rsi_status = next(batch_results)
+            _report_indicators(data, buf, latest_only=latest_only, indicators=symbol_indicators,
+                               rsi_status=rsi_status)
+        _write_report(buf, out)
 
 
-def main():
+def main(argv=None):
     """
     主函数
+    :param argv: 命令行参数列表，为None时读取sys.argv
     """
+    parser = argparse.ArgumentParser(description="美股技术指标监测程序 (MACD & RSI)")
+    parser.add_argument("--history", default=DEFAULT_PERIOD,
+                        help=f"获取数据的时间范围，如 3mo、6mo、1y (默认 {DEFAULT_PERIOD})")
+    parser.add_argument("--latest", action="store_true",
+                        help="只显示最新指标值，不检测买卖信号")
+    args = parser.parse_args(argv)
+    
     print("美股技术指标监测程序 (MACD & RSI)")
     print("=" * 50)
     
     while True:
-        symbol = input("\n请输入美股股票代码 (如 AAPL, TSLA, QQQ, SPY 等)，或输入 'quit' 退出: ").strip().upper()
+        symbols = input("\n请输入美股股票代码 (如 AAPL, TSLA, QQQ, SPY 等，多个代码用空格分隔)，或输入 'quit' 退出: ").upper().split()
         
-        if symbol == 'QUIT':
+        if symbols == ['QUIT']:
             print("程序已退出。")
             break
         
-        if not symbol:
+        if not symbols:
             print("请输入有效的股票代码。")
             continue
         
-        analyze_stock_indicators(symbol)
+        analyze_many(list(dict.fromkeys(symbols)), latest_only=args.latest, period=args.history)
 
 
 if __name__ == "__main__":
@@ -6,55 +6,109 @@
 import sys
 sys.path.append('/workspace')
 
-from stock_indicator_monitor import calculate_macd, calculate_rsi, detect_macd_signals, detect_rsi_signals
-import yfinance as yf
+import numpy as np
+import pandas as pd
+
+from stock_indicator_monitor import (_classify_rsi, calculate_indicators_batch, calculate_latest_indicators,
+                                     calculate_macd, calculate_rsi, detect_combined_signals,
+                                     detect_macd_signals, detect_overbought_oversold, detect_rsi_signals)
 
 def test_with_sample_data():
     """使用真实数据测试程序功能"""
     print("正在获取AAPL的历史数据进行测试...")
     
-    # 获取AAPL的数据作为示例
+    # 获取AAPL的数据作为示例，只有获取数据失败时才跳过，计算和校验中的错误不应被吞掉
     try:
+        import yfinance as yf
+        
         stock = yf.Ticker("AAPL")
         data = stock.history(period="2mo")  # 获取2个月的数据
-        
-        if data.empty:
-            print("无法获取数据")
-            return
-        
-        print(f"获取到 {len(data)} 条数据")
-        
-        # 计算MACD
-        print("\n计算MACD指标...")
-        macd_line, signal_line, histogram = calculate_macd(data)
-        
-        # 计算RSI
-        print("计算RSI指标...")
-        rsi = calculate_rsi(data)
-        
-        # 检测信号
-        print("检测MACD信号...")
-        macd_buy_signals, macd_sell_signals = detect_macd_signals(macd_line, signal_line)
-        
-        print("检测RSI信号...")
-        rsi_buy_signals, rsi_sell_signals = detect_rsi_signals(rsi)
-        
-        # 显示结果
-        print(f"\n--- 测试结果 ---")
-        print(f"最新MACD值: {macd_line.iloc[-1]:.4f}")
-        print(f"最新信号线值: {signal_line.iloc[-1]:.4f}")
-        print(f"最新RSI值: {rsi.iloc[-1]:.2f}")
-        
-        print(f"MACD买入信号次数: {len(macd_buy_signals)}")
-        print(f"MACD卖出信号次数: {len(macd_sell_signals)}")
-        
-        print(f"RSI买入信号次数: {len(rsi_buy_signals)}")
-        print(f"RSI卖出信号次数: {len(rsi_sell_signals)}")
-        
-        print("程序功能测试完成！")
-        
     except Exception as e:
-        print(f"测试过程中出现错误: {e}")
+        print(f"获取测试数据时出现错误: {e}")
+        return
+    
+    if data.empty:
+        print("无法获取数据")
+        return
+    
+    print(f"获取到 {len(data)} 条数据")
+    
+    # 计算MACD
+    print("\n计算MACD指标...")
+    macd_line, signal_line, histogram = calculate_macd(data)
+    
+    # 计算RSI
+    print("计算RSI指标...")
+    rsi = calculate_rsi(data)
+    
+    # 检测信号
+    print("检测MACD信号...")
+    macd_buy_signals, macd_sell_signals = detect_macd_signals(macd_line, signal_line)
+    
+    print("检测RSI信号...")
+    rsi_buy_signals, rsi_sell_signals = detect_rsi_signals(rsi)
+    
+    # 显示结果
+    print(f"\n--- 测试结果 ---")
+    print(f"最新MACD值: {macd_line[-1]:.4f}")
+    print(f"最新信号线值: {signal_line[-1]:.4f}")
+    print(f"最新RSI值: {rsi[-1]:.2f}")
+    
+    print(f"MACD买入信号次数: {len(macd_buy_signals)}")
+    print(f"MACD卖出信号次数: {len(macd_sell_signals)}")
+    
+    print(f"RSI买入信号次数: {len(rsi_buy_signals)}")
+    print(f"RSI卖出信号次数: {len(rsi_sell_signals)}")
+    
+    # 只计算最新值的快速路径应与完整序列的最新值一致 (完整序列为float32)
+    print("\n检查最新值快速路径...")
+    latest = calculate_latest_indicators(data)
+    expected = (macd_line[-1], signal_line[-1], rsi[-1])
+    assert np.allclose(latest, expected, rtol=1e-4, atol=1e-4, equal_nan=True), (latest, expected)
+    print("最新值快速路径与完整计算结果一致")
+    
+    print("程序功能测试完成！")
+
+
+def _synthetic_data(n, seed):
+    """生成可复现的模拟行情数据"""
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, n)))
+    return pd.DataFrame({'Close': close}, index=pd.bdate_range('2024-01-01', periods=n))
+
+
+def test_offline_indicators():
+    """使用模拟数据校验快速路径、批量计算和信号检测与单只股票计算结果一致"""
+    datas = [_synthetic_data(n, seed) for seed, n in enumerate((120, 60, 30, 5))]
+    
+    # 只计算最新值的快速路径应与完整序列的最新值一致 (完整序列为float32)
+    for data in datas:
+        macd_line, signal_line, _ = calculate_macd(data)
+        rsi = calculate_rsi(data)
+        latest = calculate_latest_indicators(data)
+        expected = (macd_line[-1], signal_line[-1], rsi[-1])
+        assert np.allclose(latest, expected, rtol=1e-4, atol=1e-4, equal_nan=True), (latest, expected)
+    
+    # 不同长度的股票批量计算结果应与逐只计算一致
+    for data, batch in zip(datas, calculate_indicators_batch(datas)):
+        single = (*calculate_macd(data), calculate_rsi(data))
+        for got, want in zip(batch, single):
+            assert len(got) == len(want)
+            assert np.allclose(got, want, rtol=1e-4, atol=1e-4, equal_nan=True)
+    
+    # 综合信号应与逐个比较的结果一致
+    macd_line, signal_line, _ = calculate_macd(datas[0])
+    rsi = calculate_rsi(datas[0])
+    for macd_signals, rsi_signals in zip(detect_macd_signals(macd_line, signal_line), detect_rsi_signals(rsi)):
+        expected = [m for m in macd_signals if any(abs(m - r) <= 2 for r in rsi_signals)]
+        assert detect_combined_signals(macd_signals, rsi_signals) == expected
+    assert detect_combined_signals([3, 10, 20], [1, 12, 30]) == [3, 10]
+    
+    # 批量判断RSI状态应与逐个判断一致，NaN视为正常
+    values = [np.nan, 0.0, 29.99, 30.0, 50.0, 70.0, 70.01, 100.0]
+    assert _classify_rsi(values).tolist() == [detect_overbought_oversold(v) for v in values]
+    assert _classify_rsi(values).tolist() == ["正常", "超卖", "超卖", "正常", "正常", "正常", "超买", "超买"]
 
 if __name__ == "__main__":
+    test_offline_indicators()
     test_with_sample_data()
\ No newline at end of file
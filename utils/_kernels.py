@@ -0,0 +1,121 @@
+"""
+MACD和RSI的numba JIT计算内核
+未预编译(AOT)内核或使用批量计算时才导入本模块，避免每次启动都导入numba
+单只股票内核同时作为 build_kernels.py 预编译的源函数，两者均不启用fastmath，保证浮点计算结果一致
+"""
+import numpy as np
+
+from utils._njit import njit, prange
+
+
+@njit(cache=True)
+def macd_kernel(x, alpha_fast, alpha_slow, alpha_signal):
+    """
+    单次遍历同时计算快慢EMA、MACD线、信号线和柱状图
+    EMA采用与pandas ewm(adjust=True)一致的加权平均形式
+    输入输出为float32数组，递推累加量保持float64精度
+    :param x: 收盘价数组 (float32)
+    :param alpha_fast: 快速EMA平滑系数
+    :param alpha_slow: 慢速EMA平滑系数
+    :param alpha_signal: 信号线EMA平滑系数
+    :return: MACD线, 信号线, MACD柱状图
+    """
+    n = x.size
+    macd_line = np.empty(n, dtype=np.float32)
+    signal_line = np.empty(n, dtype=np.float32)
+    histogram = np.empty(n, dtype=np.float32)
+    
+    decay_fast = 1.0 - alpha_fast
+    decay_slow = 1.0 - alpha_slow
+    decay_signal = 1.0 - alpha_signal
+    
+    # 各EMA的加权和与权重和
+    sum_fast = sum_slow = sum_signal = 0.0
+    weight_fast = weight_slow = weight_signal = 0.0
+    
+    for i in range(n):
+        price = float(x[i])
+        sum_fast = price + decay_fast * sum_fast
+        weight_fast = 1.0 + decay_fast * weight_fast
+        sum_slow = price + decay_slow * sum_slow
+        weight_slow = 1.0 + decay_slow * weight_slow
+        
+        macd = sum_fast / weight_fast - sum_slow / weight_slow
+        
+        sum_signal = macd + decay_signal * sum_signal
+        weight_signal = 1.0 + decay_signal * weight_signal
+        signal = sum_signal / weight_signal
+        
+        macd_line[i] = macd
+        signal_line[i] = signal
+        histogram[i] = macd - signal
+    
+    return macd_line, signal_line, histogram
+
+
+@njit(cache=True)
+def rsi_kernel(gain, loss, period):
+    """
+    使用Wilder平滑法单次遍历计算RSI
+    输入输出为float32数组，递推累加量保持float64精度
+    :param gain: 每日上涨幅度数组 (float32，与收盘价对齐，首个值为0)
+    :param loss: 每日下跌幅度数组 (float32，与收盘价对齐，首个值为0)
+    :param period: RSI计算周期
+    :return: RSI数组，前period个值为NaN
+    """
+    n = gain.size
+    rsi = np.full(n, np.nan, dtype=np.float32)
+    if n <= period:
+        return rsi
+    
+    # 以前period个价格变化的简单平均作为初始值
+    avg_gain = 0.0
+    avg_loss = 0.0
+    for i in range(1, period + 1):
+        avg_gain += float(gain[i])
+        avg_loss += float(loss[i])
+    avg_gain /= period
+    avg_loss /= period
+    rsi[period] = 100.0 - 100.0 / (1.0 + avg_gain / avg_loss) if avg_loss > 0 else 100.0
+    
+    # 之后按 (前值 * (period - 1) + 当前值) / period 递推
+    for i in range(period + 1, n):
+        avg_gain = (avg_gain * (period - 1) + float(gain[i])) / period
+        avg_loss = (avg_loss * (period - 1) + float(loss[i])) / period
+        rsi[i] = 100.0 - 100.0 / (1.0 + avg_gain / avg_loss) if avg_loss > 0 else 100.0
+    
+    return rsi
+
+
+@njit(parallel=True, cache=True)
+def batch_kernel(prices, gains, losses, lengths, alpha_fast, alpha_slow, alpha_signal, period):
+    """
+    按股票并行计算多只股票的MACD和RSI
+    :param prices: 收盘价矩阵 (股票数 x K线数，float32)，每行右对齐，左侧不足部分为NaN
+    :param gains: 与prices同形状的上涨幅度矩阵
+    :param losses: 与prices同形状的下跌幅度矩阵
+    :param lengths: 每只股票的有效K线数量
+    :param alpha_fast: 快速EMA平滑系数
+    :param alpha_slow: 慢速EMA平滑系数
+    :param alpha_signal: 信号线EMA平滑系数
+    :param period: RSI计算周期
+    :return: MACD线, 信号线, MACD柱状图, RSI 四个与prices同形状的矩阵
+    """
+    n_symbols, n_bars = prices.shape
+    macd_lines = np.full((n_symbols, n_bars), np.nan, dtype=np.float32)
+    signal_lines = np.full((n_symbols, n_bars), np.nan, dtype=np.float32)
+    histograms = np.full((n_symbols, n_bars), np.nan, dtype=np.float32)
+    rsis = np.full((n_symbols, n_bars), np.nan, dtype=np.float32)
+    
+    # 各股票之间相互独立，按行并行
+    for s in prange(n_symbols):
+        start = n_bars - lengths[s]
+        macd_line, signal_line, histogram = macd_kernel(
+            prices[s, start:], alpha_fast, alpha_slow, alpha_signal
+        )
+        macd_lines[s, start:] = macd_line
+        signal_lines[s, start:] = signal_line
+        histograms[s, start:] = histogram
+        rsis[s, start:] = rsi_kernel(gains[s, start:], losses[s, start:], period)
+    
+    return macd_lines, signal_lines, histograms, rsis
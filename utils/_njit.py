@@ -0,0 +1,22 @@
+"""
+numba JIT装饰器封装
+未安装numba时njit退化为空装饰器、prange退化为range，被修饰的函数按普通Python代码执行
+"""
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+    prange = range
+
+    def njit(*args, **kwargs):
+        """
+        numba.njit的空实现，支持@njit与@njit(...)两种写法
+        """
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+
+        def decorator(func):
+            return func
+
+        return decorator